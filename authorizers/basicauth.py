@@ -1,35 +1,46 @@
 import os
 import sys
 import re
+import hmac
 import logging
-from urllib.parse import unquote
+from functools import lru_cache
 from typing import Tuple, List, Optional
-from base64 import b64decode
 from urllib.error import HTTPError
 
+from .decode import DecodeError, basicauth_decode
 
-BASIC_AUTH_USERNAME = os.getenv('BASIC_AUTH_USERNAME', None)
-BASIC_AUTH_PASSWORD = os.getenv('BASIC_AUTH_PASSWORD', None)
-
-if not all((BASIC_AUTH_USERNAME, BASIC_AUTH_PASSWORD)):
-    raise ValueError(f'Required ENVIRONMENT VARIABLE(s) not set: BASIC_AUTH_USERNAME and/or BASIC_AUTH_PASSWORD')
-
-logging.basicConfig(
-    stream=sys.stdout,
-    level=logging.INFO,
-    format='%(asctime)s [%(levelname)s] (%(name)s) %(funcName)s: %(message)s'
-)
 
-logger = logging.getLogger()
+if os.getenv('AWS_LAMBDA_FUNCTION_NAME'):
+    # the lambda runtime already attaches a (timestamped) handler to the root logger.
+    # basicConfig() would be a no-op here, skip it explicitly rather than relying on that behavior.
+    logger = logging.getLogger()
+else:
+    logging.basicConfig(
+        stream=sys.stdout,
+        level=logging.INFO,
+        format='%(asctime)s [%(levelname)s] (%(name)s) %(funcName)s: %(message)s'
+    )
+    logger = logging.getLogger()
 
 LOG_LEVEL = os.getenv('LOG_LEVEL', 'DEBUG')
 if LOG_LEVEL and LOG_LEVEL in ('INFO', 'ERROR', 'WARNING', 'DEBUG', 'CRITICAL'):
     level = getattr(logging, LOG_LEVEL)
     logger.setLevel(level)
 
+BASIC_AUTH_USERNAME = os.getenv('BASIC_AUTH_USERNAME', None)
+BASIC_AUTH_PASSWORD = os.getenv('BASIC_AUTH_PASSWORD', None)
+
+if not BASIC_AUTH_USERNAME or not BASIC_AUTH_PASSWORD:
+    logger.critical('Required ENVIRONMENT VARIABLE(s) not set: BASIC_AUTH_USERNAME and/or BASIC_AUTH_PASSWORD')
+    raise ValueError(f'Required ENVIRONMENT VARIABLE(s) not set: BASIC_AUTH_USERNAME and/or BASIC_AUTH_PASSWORD')
+
+# expected credentials as bytes, encoded once at cold-start for hmac.compare_digest() in the handler
+_EXPECTED_USER = BASIC_AUTH_USERNAME.encode('utf-8')
+_EXPECTED_PASS = BASIC_AUTH_PASSWORD.encode('utf-8')
+
 
-class DecodeError(Exception):
-    pass
+# The regular expression used to validate resource paths for the policy
+_PATH_RE = re.compile(r"^[/.a-zA-Z0-9-\*]+$")
 
 
 class HttpVerb:
@@ -43,6 +54,9 @@ class HttpVerb:
     ALL = "*"
 
 
+_ALLOWED_VERBS = frozenset({"GET", "POST", "PUT", "PATCH", "HEAD", "DELETE", "OPTIONS", "*"})
+
+
 class AuthPolicy:
     """
     Derived From awslabs blueprint:
@@ -58,7 +72,7 @@ class AuthPolicy:
     version = "2012-10-17"
 
     # The regular expression used to validate resource paths for the policy
-    pathRegex = r"^[/.a-zA-Z0-9-\*]+$"
+    pathRegex = _PATH_RE.pattern
 
     # these are the internal lists of allowed and denied methods. These are lists
     # of objects and each object has 2 properties: A resource ARN and a nullable
@@ -88,17 +102,16 @@ class AuthPolicy:
         Adds a method to the internal lists of allowed or denied methods. Each object in
         the internal list contains a resource ARN and a condition statement. The condition
         statement can be null."""
-        if verb != "*" and not hasattr(HttpVerb, verb):
+        if verb not in _ALLOWED_VERBS:
             raise NameError(f"Invalid HTTP verb {verb}. Allowed verbs in HttpVerb class")
-        resource_pattern = re.compile(self.pathRegex)
-        if not resource_pattern.match(resource):
+        if not _PATH_RE.match(resource):
             raise NameError(f"Invalid resource path: {resource}. Path should match {self.pathRegex}")
 
         if resource.endswith("/"):
             resource = resource[1:]  # remove trailing slash, '/'
 
         resource_arn = f"arn:aws:execute-api:{self.region}:{self.aws_accountid}:{self.restapiid}/{self.stage}/{verb}/{resource}"
-        logger.info(f'resourceArn: {resource_arn}')
+        logger.info('resourceArn: %s', resource_arn)
 
         if effect.lower() == "allow":
             self.allow_methods.append({
@@ -111,40 +124,58 @@ class AuthPolicy:
                 'conditions': conditions
             })
 
-    def _get_empty_statement(self, effect):
-        """Returns an empty statement object prepopulated with the correct action and the
-        desired effect."""
-        statement = {
-            'Action': 'execute-api:Invoke',
-            'Effect': effect[:1].upper() + effect[1:].lower(),
-            'Resource': []
-        }
-        return statement
-
     def _get_statement_for_effect(self, effect, methods):
         """This function loops over an array of objects containing a resourceArn and
         conditions statement and generates the array of statements for the policy."""
-        statements = []
-
-        if len(methods) > 0:
-            statement = self._get_empty_statement(effect)
-
-            for curMethod in methods:
-                if curMethod['conditions'] is None or len(curMethod['conditions']) == 0:
-                    statement['Resource'].append(curMethod['resourceArn'])
-                else:
-                    conditional_statement = self._get_empty_statement(effect)
-                    conditional_statement['Resource'].append(curMethod['resourceArn'])
-                    conditional_statement['Condition'] = curMethod['conditions']
-                    statements.append(conditional_statement)
-
-            statements.append(statement)
-
+        if not methods:
+            return []
+
+        effect_field = effect[:1].upper() + effect[1:].lower()
+        unconditional = [method['resourceArn'] for method in methods if not method.get('conditions')]
+        conditional = [method for method in methods if method.get('conditions')]
+
+        # methods with conditions have their own statement
+        statements = [
+            {
+                'Action': 'execute-api:Invoke',
+                'Effect': effect_field,
+                'Resource': [method['resourceArn']],
+                'Condition': method['conditions'],
+            }
+            for method in conditional
+        ]
+        statements.append({
+            'Action': 'execute-api:Invoke',
+            'Effect': effect_field,
+            'Resource': unconditional,
+        })
         return statements
 
     def allow_all_methods(self):
         """Adds a '*' allow to the policy to authorize access to all methods of an API"""
-        self._add_method("Allow", HttpVerb.ALL, "*", [])
+        self._add_method("Allow", "*", "*", [])
+
+    @classmethod
+    @lru_cache(maxsize=128)
+    def build_allow_all(cls, principal_id: str, account_id: str, restapiid: str, stage: str) -> dict:
+        """
+        Returns the policy document produced by allow_all_methods() + build() for the given restapi stage,
+        without the intermediate method lists.
+        The result is cached and shared between calls, it must not be modified.
+        """
+        return {
+            'principalId': principal_id,
+            'policyDocument': {
+                'Version': cls.version,
+                'Statement': [
+                    {
+                        'Action': 'execute-api:Invoke',
+                        'Effect': 'Allow',
+                        'Resource': [f'arn:aws:execute-api:*:{account_id}:{restapiid}/{stage}/*/*'],
+                    }
+                ]
+            }
+        }
 
     def build(self):
         """Generates the policy document based on the internal lists of allowed and denied
@@ -185,77 +216,31 @@ def parse_arn(arn_str: str) -> Tuple[str, str, str, Optional[str], str, Optional
     resource_type = None
     resource = None
     qualifiers = None
-    if not any(separator in resource_elements for separator in (':', '/')):
+    colon_index = resource_elements.find(':')
+    slash_index = resource_elements.find('/')
+    if colon_index < 0 and slash_index < 0:
         resource = resource_elements
-    elif ':' in resource_elements and '/' not in resource_elements:
-        if resource_elements.count(':') == 1:
-            resoruce_type, resource = resource_elements.split(':')
-        elif resource_elements.count(':') >= 2:
-            resource_type, resource, *qualifiers = resource_elements.split(':')
-    elif ':' not in resource_elements and '/' in resource_elements:
-        if resource_elements.count('/') == 1:
-            resoruce_type, resource = resource_elements.split('/')
-        elif resource_elements.count('/') >= 2:
-            resource_type, resource, *qualifiers = resource_elements.split('/')
-    elif ':' in resource_elements and '/' in resource_elements:
-        # 'arn:partition:service:region:account-id:resourcetype/resource:qualifier'
-        resource_type, remaining = resource_elements.split('/')
-        resource, qualifier = remaining.split(':')
-
-    return service, region, account_id, resource_type, resource, qualifiers
-
-
-def basicauth_decode(encoded_str: bytes) -> Tuple[str, str]:
-    """
-    Decode an encrypted HTTP basic authentication string. Returns a tuple of
-    the form (username, password), and raises a DecodeError exception if
-    nothing could be decoded.
-    """
-    try:
-        if isinstance(encoded_str, str):
-            components = encoded_str.strip().split(' ')
-        else:
-            components = encoded_str.decode('utf8').strip().split(' ')
-    except Exception as e:
-        logger.exception(e)
-        logger.error(f'unable to decode header "encoded_str": {encoded_str}')
-        raise DecodeError
-
-    # If split is only one element, try to decode the username and password
-    # directly.
-    if len(components) == 1:
-        try:
-            username, password = b64decode(components).split(':', 1)
-        except Exception as e:
-            logger.exception(e)
-            logger.error(f'unable to b64decode "components": {components}')
-            raise DecodeError
-
-    # If there are only two elements, check the first and ensure it says
-    # 'basic' so that we know we're about to decode the right thing. If not,
-    # bail out.
-    elif len(components) == 2:
-        first_component = components[0].strip()
-        second_component = components[1].strip()
-        if first_component.lower() == 'basic':
-            try:
-                encoded_second_component = second_component.encode('utf8')  # b64decode requires a bytes-like object
-                encoded_username, encoded_password = b64decode(encoded_second_component).split(b':', 1)
-                username = encoded_username.decode('utf8')
-                password = encoded_password.decode('utf8')
-            except Exception as e:
-                logger.exception(e)
-                logger.error(f'unable to b64decode "second_component": {second_component}')
-                raise DecodeError
+    elif slash_index >= 0 and (colon_index < 0 or slash_index < colon_index):
+        # the first '/' separates the resourcetype, any ':' after it belongs to the resource/qualifier
+        resource_type, _, remaining = resource_elements.partition('/')
+        if '/' in remaining:
+            # 'arn:partition:service:region:account-id:resourcetype/resource/qualifier'
+            # - execute-api request paths may contain ':', only '/' separates qualifiers here
+            resource, *qualifiers = remaining.split('/')
+        elif ':' in remaining:
+            # 'arn:partition:service:region:account-id:resourcetype/resource:qualifier'
+            resource, _, qualifier = remaining.partition(':')
+            qualifiers = [qualifier]
         else:
-            logger.error(f'len(components) == 2, first_component.lower() != "basic": first_component={first_component}')
-            raise DecodeError
-
-    # If there are more than 2 elements, something crazy must be happening.
+            resource = remaining
     else:
-        raise DecodeError
+        resource_type, _, remaining = resource_elements.partition(':')
+        if ':' in remaining:
+            resource, *qualifiers = remaining.split(':')
+        else:
+            resource = remaining
 
-    return unquote(username), unquote(password)
+    return service, region, account_id, resource_type, resource, qualifiers
 
 
 def check_basicauth_header_authorization_handler(event, context):
@@ -267,24 +252,24 @@ def check_basicauth_header_authorization_handler(event, context):
     username = None
     password = None
     if not authorization_header:
-        logger.warning(f'Authorization Header not given!')
-        logger.warning(f'headers: {event["headers"]}')
+        logger.warning('Authorization Header not given!')
+        logger.warning('headers: %s', event['headers'])
         raise HTTPError('Unauthorized')  # Raises 401 response from API Gateway
     else:
         try:
             username, password = basicauth_decode(authorization_header)
         except DecodeError as e:
-            logger.error(f'DecodeError: {e.args}')
+            logger.error('DecodeError: %s', e.args)
             raise Exception('Unauthorized')  # Raises 401 response from API Gateway
         # prepare reference principal_id
         # https://docs.aws.amazon.com/AmazonS3/latest/dev/s3-bucket-user-policy-specifying-principal-intro.html
         principal_id = '*'
 
-    if username != BASIC_AUTH_USERNAME:
-        logger.error(f'Invalid Username: {username}')
-        raise Exception('Unauthorized')  # Raises 401 response from API Gateway
-    elif password != BASIC_AUTH_PASSWORD:
-        logger.error(f'Invalid password: {password}')
+    # compare both values without short-circuiting to avoid leaking timing information
+    username_valid = hmac.compare_digest(username, _EXPECTED_USER)
+    password_valid = hmac.compare_digest(password, _EXPECTED_PASS)
+    if not (username_valid and password_valid):
+        logger.error('Invalid credentials for username: %r', username)
         raise Exception('Unauthorized')  # Raises 401 response from API Gateway
 
     # arn:partition:service:region:account-id:resourcetype/resource/qualifier
@@ -292,15 +277,10 @@ def check_basicauth_header_authorization_handler(event, context):
     # api-id = resource_type
     # stage-name = resource
     method_arn = event['methodArn']
-    logger.info(f'Parsing methodArn({event["methodArn"]}) ...')
+    logger.info('Parsing methodArn(%s) ...', method_arn)
     service, region, account_id, resource_type, resource, qualifiers = parse_arn(method_arn)
 
-    policy = AuthPolicy(principal_id, account_id)
-    policy.restapiid = resource_type
-    policy.stage = resource
-    policy.allow_all_methods()
-
-    authorization_response = policy.build()
+    authorization_response = AuthPolicy.build_allow_all(principal_id, account_id, resource_type, resource)
     # add additional key-value pairs associated with the authenticated principal these are made available by APIGW like so: $context.authorizer.<key>
     # additional context is cached
     # context = {'key': 'value', ...  }
@@ -0,0 +1,67 @@
+"""
+HTTP Basic authentication header decoding.
+Kept free of import-time side effects so that it can be compiled with mypyc (see `make compile`),
+the compiled extension module takes precedence over this file when present.
+"""
+import logging
+from urllib.parse import unquote_to_bytes
+from typing import Callable, Tuple
+
+# declared so that both imports bind the same type (their signatures differ)
+_b64decode: Callable[..., bytes]
+try:
+    # SIMD accelerated decoder, falls back to stdlib when the C extension is unavailable (local dev)
+    from pybase64 import b64decode as _b64decode
+except ImportError:
+    from base64 import b64decode as _b64decode
+
+logger = logging.getLogger(__name__)
+
+
+class DecodeError(Exception):
+    pass
+
+
+def _maybe_unquote(value: bytes) -> bytes:
+    """Unquote percent-escapes, skipping the call when the value contains none"""
+    return unquote_to_bytes(value) if b'%' in value else value
+
+
+def basicauth_decode(header: str) -> Tuple[bytes, bytes]:
+    """
+    Decode an encrypted HTTP basic authentication string. Returns a tuple of
+    the form (username, password) as bytes, and raises a DecodeError exception if
+    nothing could be decoded.
+    """
+    scheme, _, encoded = header.strip().partition(' ')
+
+    # If there is no separator, try to decode the username and password
+    # directly.
+    if not encoded:
+        encoded = scheme
+
+    # Otherwise, check the scheme and ensure it says 'basic' so that we know
+    # we're about to decode the right thing. If not, bail out.
+    elif scheme.lower() != 'basic':
+        logger.error('scheme.lower() != "basic": scheme=%s', scheme)
+        raise DecodeError
+
+    # If there are more than 2 elements, something crazy must be happening.
+    # (checked before encoding/decoding so that oversized headers are rejected early)
+    elif ' ' in encoded:
+        logger.error('unexpected separator in credentials, len(header)=%d', len(header))
+        raise DecodeError
+
+    try:
+        raw = _b64decode(encoded.encode('ascii'), validate=True)
+    except Exception as e:
+        # exception messages may contain credential characters (UnicodeEncodeError), log the type only
+        logger.error('unable to b64decode "encoded" (%s), len(encoded)=%d', type(e).__name__, len(encoded))
+        raise DecodeError
+
+    username, separator, password = raw.partition(b':')
+    if not separator:
+        logger.error('decoded credentials missing ":" separator')
+        raise DecodeError
+
+    return _maybe_unquote(username), _maybe_unquote(password)
@@ -2,11 +2,24 @@
 import sys
 import json
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Tuple
 
 import boto3
+from botocore.config import Config
+
+# number of concurrent APIGW.update_method calls
+MAX_WORKERS = 16
+
+# connection pool is larger than MAX_WORKERS so that workers never wait on a free connection
+APIGW_CONFIG = Config(
+    max_pool_connections=32,
+    retries={'mode': 'adaptive', 'max_attempts': 5},
+)
 
 APIGW = boto3.client(
-    'apigateway'
+    'apigateway',
+    config=APIGW_CONFIG,
 )
 
 
@@ -48,46 +61,58 @@ def install_authorizer_to_restapi_methods(restapi_id: str):
     authorizer_id = authorizer_info['id']
     authorizer_name = authorizer_info['name']
 
+    # apply authorizer to method
+    operations = [
+        {
+            'op': 'replace',
+            'path': '/authorizationType',  # path to the field to update in the Method JSON representation
+            'value': 'CUSTOM',
+        },
+        {
+            'op': 'replace',
+            'path': '/authorizerId',
+            'value': authorizer_id,
+        }
+    ]
+
+    def _apply(resource_method: Tuple[str, str]) -> None:
+        resource_id, method = resource_method
+        response = APIGW.update_method(
+            restApiId=restapi_id,
+            resourceId=resource_id,
+            httpMethod=method,
+            patchOperations=operations
+        )
+        if logger.isEnabledFor(logging.INFO):
+            response.pop('ResponseMetadata')  # remove noisy
+            formatted_response = json.dumps(response, indent=4)
+            logger.info('CUSTOM authorizer "%s(%s)" applied to restAPI Method: %s', authorizer_name, authorizer_id, formatted_response)
+
     # update resource methods with authorizer
-    response = APIGW.get_resources(
+    # - get_resources is paged, submit updates as each page is received
+    paginator = APIGW.get_paginator('get_resources')
+    pages = paginator.paginate(
         restApiId=restapi_id,
     )
-    if 'items' in response:
-        for resource in response['items']:
-            # {
-            #     "id": "i4moabc",
-            #     "parentId": "nw3sd3n123",
-            #     "pathPart": "{proxy+}",
-            #     "path": "/{proxy+}",
-            #     "resourceMethods": {
-            #         "ANY": {}
-            #     }
-            # }
-            for method in resource['resourceMethods'].keys():  # Not sure what the value is here and if it's needed for anything, ignoring for now.
-                resource_id = resource['id']
-
-                # apply authorizer to method
-                operations = [
-                    {
-                        'op': 'replace',
-                        'path': '/authorizationType',  # path to the field to update in the Method JSON representation
-                        'value': 'CUSTOM',
-                    },
-                    {
-                        'op': 'replace',
-                        'path': '/authorizerId',
-                        'value': authorizer_id,
-                    }
-                ]
-                response = APIGW.update_method(
-                    restApiId=restapi_id,
-                    resourceId=resource_id,
-                    httpMethod=method,
-                    patchOperations=operations
-                )
-                response.pop('ResponseMetadata')  # remove noisy
-                formatted_response = json.dumps(response, indent=4)
-                logger.info(f'CUSTOM authorizer "{authorizer_name}({authorizer_id})" applied to restAPI Method: {formatted_response}')
+    futures = []
+    # botocore clients are thread-safe, calls are network bound
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        for page in pages:
+            for resource in page.get('items', []):
+                # {
+                #     "id": "i4moabc",
+                #     "parentId": "nw3sd3n123",
+                #     "pathPart": "{proxy+}",
+                #     "path": "/{proxy+}",
+                #     "resourceMethods": {
+                #         "ANY": {}
+                #     }
+                # }
+                for method in resource.get('resourceMethods', {}).keys():  # Not sure what the value is here and if it's needed for anything, ignoring for now.
+                    futures.append(executor.submit(_apply, (resource['id'], method)))
+
+    for future in futures:
+        future.result()  # re-raise any update_method errors
 
 
 def deploy_api(restapi_id):
@@ -100,14 +125,14 @@ def deploy_api(restapi_id):
     stage = response['item'][0]
 
     # create a deployment for the stage
-    logger.info(f'Deploying API...')
+    logger.info('Deploying API...')
     response = APIGW.create_deployment(
         restApiId=restapi_id,
         stageName=stage['stageName']
     )
     status_code = response['ResponseMetadata']['HTTPStatusCode']
     if status_code == 201:
-        logger.info(f"create_deployment response: SUCCESS({status_code})")
+        logger.info('create_deployment response: SUCCESS(%s)', status_code)
     else:
         logger.error(response)
 
@@ -0,0 +1,5 @@
+import os
+
+# authorizers.basicauth requires the credentials to be set at import
+os.environ.setdefault('BASIC_AUTH_USERNAME', 'user')
+os.environ.setdefault('BASIC_AUTH_PASSWORD', 'p@ss')
@@ -0,0 +1,75 @@
+from base64 import b64encode
+
+import pytest
+
+from authorizers.basicauth import check_basicauth_header_authorization_handler, parse_arn
+
+
+@pytest.mark.parametrize('arn, expected', [
+    (
+        'arn:aws:execute-api:ap-northeast-1:123456789012:abc123/prod/GET/items',
+        ('execute-api', 'ap-northeast-1', '123456789012', 'abc123', 'prod', ['GET', 'items']),
+    ),
+    (
+        'arn:aws:execute-api:ap-northeast-1:123456789012:abc123/prod/*/*',
+        ('execute-api', 'ap-northeast-1', '123456789012', 'abc123', 'prod', ['*', '*']),
+    ),
+    (
+        # ':' in the request path must not change the stage
+        'arn:aws:execute-api:ap-northeast-1:123456789012:abc123/prod/GET/items/42:archive',
+        ('execute-api', 'ap-northeast-1', '123456789012', 'abc123', 'prod', ['GET', 'items', '42:archive']),
+    ),
+    (
+        'arn:aws:lambda:ap-northeast-1:123456789012:function:my-function',
+        ('lambda', 'ap-northeast-1', '123456789012', 'function', 'my-function', None),
+    ),
+    (
+        'arn:aws:lambda:ap-northeast-1:123456789012:function:my-function:1',
+        ('lambda', 'ap-northeast-1', '123456789012', 'function', 'my-function', ['1']),
+    ),
+    (
+        'arn:aws:service:ap-northeast-1:123456789012:type/resource:qualifier',
+        ('service', 'ap-northeast-1', '123456789012', 'type', 'resource', ['qualifier']),
+    ),
+    (
+        'arn:aws:s3:::my-bucket',
+        ('s3', '', '', None, 'my-bucket', None),
+    ),
+])
+def test_parse_arn(arn, expected):
+    assert parse_arn(arn) == expected
+
+
+def _event(authorization=None):
+    headers = {}
+    if authorization:
+        headers['Authorization'] = authorization
+    return {
+        'headers': headers,
+        'methodArn': 'arn:aws:execute-api:ap-northeast-1:123456789012:abc123/prod/GET/items',
+    }
+
+
+def test_check_basicauth_header_authorization_handler():
+    credentials = b64encode(b'user:p@ss').decode('ascii')
+    response = check_basicauth_header_authorization_handler(_event(f'Basic {credentials}'), None)
+    assert response == {
+        'principalId': '*',
+        'policyDocument': {
+            'Version': '2012-10-17',
+            'Statement': [
+                {
+                    'Action': 'execute-api:Invoke',
+                    'Effect': 'Allow',
+                    'Resource': ['arn:aws:execute-api:*:123456789012:abc123/prod/*/*'],
+                }
+            ]
+        }
+    }
+
+
+@pytest.mark.parametrize('credentials', [b'user:wrong', b'wrong:p@ss', b'user:p@ssx', b'user:'])
+def test_check_basicauth_header_authorization_handler_invalid(credentials):
+    encoded = b64encode(credentials).decode('ascii')
+    with pytest.raises(Exception, match='Unauthorized'):
+        check_basicauth_header_authorization_handler(_event(f'Basic {encoded}'), None)
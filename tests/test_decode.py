@@ -0,0 +1,44 @@
+from base64 import b64encode
+
+import pytest
+
+from authorizers.decode import DecodeError, basicauth_decode
+
+
+def _encode(value: bytes) -> str:
+    return b64encode(value).decode('ascii')
+
+
+def test_basicauth_decode():
+    assert basicauth_decode(f'Basic {_encode(b"user:p@ss")}') == (b'user', b'p@ss')
+
+
+def test_basicauth_decode_scheme_case_insensitive():
+    assert basicauth_decode(f'bAsIc {_encode(b"user:p@ss")}') == (b'user', b'p@ss')
+
+
+def test_basicauth_decode_without_scheme():
+    assert basicauth_decode(_encode(b'user:p@ss')) == (b'user', b'p@ss')
+
+
+def test_basicauth_decode_password_with_colon():
+    assert basicauth_decode(f'Basic {_encode(b"user:p:ss")}') == (b'user', b'p:ss')
+
+
+def test_basicauth_decode_percent_escapes():
+    assert basicauth_decode(f'Basic {_encode(b"us%20er:p%40ss")}') == (b'us er', b'p@ss')
+
+
+@pytest.mark.parametrize('header', [
+    f'Bearer {_encode(b"user:p@ss")}',  # wrong scheme
+    f'Basic {_encode(b"user:p@ss")} extra',  # extra component
+    f'Basic  {_encode(b"user:p@ss")}',  # extra space
+    f'Basic {_encode(b"userpass")}',  # no ':' separator
+    'Basic !!!!',  # invalid base64
+    'Basic dXNlcjpwQHNz!',  # trailing invalid character, rejected by validate=True
+    'Basic é',  # non-ascii
+    '',
+])
+def test_basicauth_decode_invalid(header):
+    with pytest.raises(DecodeError):
+        basicauth_decode(header)